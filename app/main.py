@@ -2,29 +2,213 @@
 This module implements a simple Flask API for managing items.
 It provides endpoints for retrieving, adding, updating, and deleting items.
 """
-from flask import Flask, jsonify, request, abort
+import hashlib
+import threading
+from dataclasses import dataclass
+from itertools import count
+
+import fastjsonschema
+import orjson
+from flask import Flask, Response, request
+from werkzeug.exceptions import MethodNotAllowed, NotFound
+from werkzeug.http import HTTP_STATUS_CODES
 
 # Initialize the Flask application
 app = Flask(__name__)
 
+
+@dataclass
+class Item:
+    """
+    A single stored item.
+    __slots__ drops the per-instance __dict__, so each item is far smaller than a
+    three-key dict, and orjson serializes dataclasses natively as JSON objects.
+    """
+    __slots__ = ('id', 'name', 'price')
+    id: int
+    name: str
+    price: float
+
+
 # In a real application, you'd use a database.
-# For this example, we'll use a simple in-memory list to store items.
-items = [
-    {'id': 1, 'name': 'Laptop', 'price': 1200},
-    {'id': 2, 'name': 'Mouse', 'price': 25},
-    {'id': 3, 'name': 'Keyboard', 'price': 75}
-]
-# Using a leading underscore to indicate this is an internal, mutable module-level variable
-_next_id = 4 # Simple way to generate unique IDs for new items
+# For this example, we'll use a simple in-memory dict keyed by item ID.
+# Dicts preserve insertion order, so listing all items keeps creation order
+# while single-item lookups are a hash probe instead of a list scan.
+items_by_id = {
+    1: Item(1, 'Laptop', 1200),
+    2: Item(2, 'Mouse', 25),
+    3: Item(3, 'Keyboard', 75)
+}
+# Using a leading underscore to indicate this is an internal, module-level variable
+_id_seq = count(4) # next() hands out unique IDs for new items without rebinding a global
+
+# Serialized GET /api/items body and its ETag as one (body, etag) tuple. The list
+# only changes on POST/PUT/DELETE, so it is encoded once and reused until a mutator
+# clears it. Keeping both in one global lets readers take a consistent pair in one read.
+_items_listing = None
+
+# Serialized GET /api/items/<id> bodies keyed by item ID, filled on first read
+# and dropped by the PUT/DELETE that changes the item.
+_item_json = {item_id: orjson.dumps(item) for item_id, item in items_by_id.items()}
+
+# Serializes POST/PUT/DELETE so concurrent requests (threaded or multi-greenlet
+# servers) can't hand out the same ID or interleave partial updates.
+_items_lock = threading.Lock()
+
+# Request body validators, compiled once at import into plain Python functions.
+# Both raise fastjsonschema.JsonSchemaValueException on the first violation.
+# JSON Schema's 'number' excludes booleans, so a price of true/false is rejected.
+_validate_new_item = fastjsonschema.compile({
+    'type': 'object',
+    'required': ['name', 'price'],
+    'properties': {'name': {'type': 'string'}, 'price': {'type': 'number'}}
+})
+_validate_item_update = fastjsonschema.compile({
+    'type': 'object',
+    'properties': {'name': {'type': 'string'}, 'price': {'type': 'number'}}
+})
+
+
+def _json(obj, status=200):
+    """
+    Builds a JSON response with orjson instead of Flask's stdlib-based jsonify.
+    Args:
+        obj: The object to serialize.
+        status (int): The HTTP status code of the response.
+    Returns:
+        A Response with an application/json body.
+    """
+    return app.response_class(orjson.dumps(obj), status=status, mimetype='application/json')
+
+
+# Serialized error bodies for every fixed error message, keyed by (status, message).
+# Only descriptions that embed a value (e.g. an item ID) are encoded per request.
+_ERROR_BODIES = {
+    (status, message): orjson.dumps({'error': HTTP_STATUS_CODES[status], 'message': message})
+    for status, messages in (
+        (400, (
+            "Request must be JSON.",
+            "Request body is not valid JSON.",
+            "Request body must be a JSON object.",
+            "Missing 'name' or 'price' in request body.",
+            "'name' must be a string and 'price' must be a number.",
+            "'name' must be a string.",
+            "'price' must be a number.",
+            "No update data provided.",
+        )),
+        (404, (NotFound.description,)),
+        (405, (MethodNotAllowed.description,)),
+        (500, ('An unexpected error occurred.',)),
+    )
+    for message in messages
+}
+
+
+def _error_response(status, message):
+    """
+    Builds a JSON error response, reusing the pre-serialized body when the message is fixed.
+    Route handlers return this directly instead of raising through abort(), so
+    rejected requests skip exception propagation and error-handler lookup.
+    Args:
+        status (int): The HTTP status code of the response.
+        message (str): The error description.
+    Returns:
+        A Response with an application/json error body.
+    """
+    body = _ERROR_BODIES.get((status, message))
+    if body is None:
+        body = orjson.dumps({'error': HTTP_STATUS_CODES[status], 'message': message})
+    return Response(body, status=status, mimetype='application/json')
+
+
+def _parse_json_body():
+    """
+    Reads and parses the request body once with orjson.
+    Compares the mimetype directly instead of going through request.is_json
+    and request.json, which re-inspect the Content-Type on every access.
+    Returns:
+        A (data, error) pair: the decoded JSON body and None, or None and
+        a 400 error Response to return as-is.
+    """
+    if request.mimetype != 'application/json':
+        return None, _error_response(400, "Request must be JSON.")
+    try:
+        return orjson.loads(request.get_data(cache=False)), None
+    except orjson.JSONDecodeError:
+        return None, _error_response(400, "Request body is not valid JSON.")
+
+
+def _new_item_error(data):
+    """
+    Checks a POST /api/items body against the new-item schema.
+    Args:
+        data: The decoded JSON body.
+    Returns:
+        The 400 error message, or None if the body is valid.
+    """
+    try:
+        _validate_new_item(data)
+    except fastjsonschema.JsonSchemaValueException as e:
+        if e.name == 'data' and e.rule == 'type':
+            return "Request body must be a JSON object."
+        if e.rule == 'required':
+            return "Missing 'name' or 'price' in request body."
+        return "'name' must be a string and 'price' must be a number."
+    return None
+
+
+def _item_update_error(data):
+    """
+    Checks a PUT /api/items/<id> body against the update schema.
+    Args:
+        data: The decoded JSON body.
+    Returns:
+        The 400 error message, or None if the body is valid.
+    """
+    try:
+        _validate_item_update(data)
+    except fastjsonschema.JsonSchemaValueException as e:
+        if e.name == 'data.name':
+            return "'name' must be a string."
+        if e.name == 'data.price':
+            return "'price' must be a number."
+        return "Request body must be a JSON object."
+    # If no valid fields were provided for update
+    if not data:
+        return "No update data provided."
+    return None
+
+
+def _invalidate_items_cache():
+    """Drops the cached GET /api/items body after the item store changes."""
+    global _items_listing
+    _items_listing = None
 
 @app.route('/api/items', methods=['GET'])
 def get_all_items():
     """
     Handles GET requests to retrieve all items.
     Returns:
-        A JSON array of all available items.
+        A JSON array of all available items, or 304 Not Modified if the
+        client's If-None-Match already holds the current ETag.
     """
-    return jsonify(items)
+    global _items_listing
+    # Read the global once; a mutator may reset it to None at any point after this
+    listing = _items_listing
+    if listing is None:
+        # Encode under the lock so a concurrent mutator can't leave a stale body cached
+        with _items_lock:
+            listing = _items_listing
+            if listing is None:
+                body = orjson.dumps(list(items_by_id.values()))
+                listing = (body, hashlib.blake2b(body, digest_size=8).hexdigest())
+                _items_listing = listing
+    body, etag = listing
+
+    # If-None-Match uses the weak comparison (RFC 7232), so W/"<etag>" also matches
+    if request.if_none_match.contains_weak(etag):
+        return Response(status=304, headers={'ETag': f'"{etag}"'})
+    return Response(body, mimetype='application/json', headers={'ETag': f'"{etag}"'})
 
 @app.route('/api/items/<int:item_id>', methods=['GET'])
 def get_item_by_id(item_id):
@@ -35,12 +219,16 @@ def get_item_by_id(item_id):
     Returns:
         A JSON object of the requested item if found, otherwise an error message.
     """
-    item = next((item for item in items if item['id'] == item_id), None)
-    if item:
-        return jsonify(item)
-    # If item not found, return a 404 Not Found error.
-    # Removed unnecessary 'else' block as the function returns if 'item' is found.
-    abort(404, description=f"Item with ID {item_id} not found.")
+    body = _item_json.get(item_id)
+    if body is None:
+        # Encode under the lock so a concurrent PUT can't leave a stale body cached
+        with _items_lock:
+            item = items_by_id.get(item_id)
+            # If item not found, return a 404 Not Found error.
+            if item is None:
+                return _error_response(404, f"Item with ID {item_id} not found.")
+            body = _item_json[item_id] = orjson.dumps(item)
+    return Response(body, mimetype='application/json')
 
 @app.route('/api/items', methods=['POST'])
 def add_item():
@@ -50,33 +238,22 @@ def add_item():
     Returns:
         A JSON object confirming the item addition, or an error message.
     """
-    # Check if the request body is JSON
-    if not request.is_json:
-        abort(400, description="Request must be JSON.")
-
-    data = request.json
-
-    # Validate required fields
-    if 'name' not in data or 'price' not in data:
-        abort(400, description="Missing 'name' or 'price' in request body.")
+    data, error = _parse_json_body()
+    if error is not None:
+        return error
 
-    # Validate data types
-    if not isinstance(data['name'], str) or not isinstance(data['price'], (int, float)):
-        abort(400, description="'name' must be a string and 'price' must be a number.")
+    # Validate required fields and data types
+    message = _new_item_error(data)
+    if message is not None:
+        return _error_response(400, message)
 
-    # Pylint warns about 'global' statement. In a real app, this data would be
-    # managed by a database layer or an object-oriented approach to avoid global state.
-    global _next_id
-    new_item = {
-        'id': _next_id,
-        'name': data['name'],
-        'price': data['price']
-    }
-    items.append(new_item)
-    _next_id += 1 # Increment for the next new item
+    with _items_lock:
+        new_item = Item(next(_id_seq), data['name'], data['price'])
+        items_by_id[new_item.id] = new_item
+        _invalidate_items_cache()
 
     # Return 201 Created status code for successful creation
-    return jsonify({'message': 'Item added successfully', 'item': new_item}), 201
+    return _json({'message': 'Item added successfully', 'item': new_item}, 201)
 
 @app.route('/api/items/<int:item_id>', methods=['PUT'])
 def update_item(item_id):
@@ -86,30 +263,32 @@ def update_item(item_id):
     Returns:
         A JSON object confirming the update, or an error message.
     """
-    item = next((item for item in items if item['id'] == item_id), None)
-    if not item:
-        abort(404, description=f"Item with ID {item_id} not found.")
+    # Reject unknown IDs before reading the body; the lookup is repeated under the lock
+    if item_id not in items_by_id:
+        return _error_response(404, f"Item with ID {item_id} not found.")
 
-    if not request.is_json:
-        abort(400, description="Request must be JSON.")
+    data, error = _parse_json_body()
+    if error is not None:
+        return error
 
-    data = request.json
+    # Validate every field before writing any of them
+    message = _item_update_error(data)
+    if message is not None:
+        return _error_response(400, message)
 
-    # Update fields if provided and valid
-    if 'name' in data:
-        if not isinstance(data['name'], str):
-            abort(400, description="'name' must be a string.")
-        item['name'] = data['name']
-    if 'price' in data:
-        if not isinstance(data['price'], (int, float)):
-            abort(400, description="'price' must be a number.")
-        item['price'] = data['price']
-
-    # If no valid fields were provided for update
-    if not data:
-        abort(400, description="No update data provided.")
+    with _items_lock:
+        # A DELETE may have landed since the check above; don't update a detached item
+        item = items_by_id.get(item_id)
+        if item is None:
+            return _error_response(404, f"Item with ID {item_id} not found.")
+        if 'name' in data:
+            item.name = data['name']
+        if 'price' in data:
+            item.price = data['price']
+        _invalidate_items_cache()
+        _item_json.pop(item_id, None)
 
-    return jsonify({'message': 'Item updated successfully', 'item': item})
+        return _json({'message': 'Item updated successfully', 'item': item})
 
 @app.route('/api/items/<int:item_id>', methods=['DELETE'])
 def delete_item(item_id):
@@ -118,35 +297,34 @@ def delete_item(item_id):
     Returns:
         A JSON object confirming the deletion, or an error message.
     """
-    # Pylint warns about 'global' statement. See comment in add_item.
-    global items
-    # Filter out the item to be deleted
-    initial_length = len(items)
-    items = [item for item in items if item['id'] != item_id]
+    # Remove the item in place; pop returns None if the ID was never stored
+    with _items_lock:
+        if items_by_id.pop(item_id, None) is None:
+            return _error_response(404, f"Item with ID {item_id} not found.")
+        _invalidate_items_cache()
+        _item_json.pop(item_id, None)
+    return _json({'message': f'Item with ID {item_id} deleted successfully'}, 200) # OK status
 
-    if len(items) == initial_length:
-        # If length didn't change, item was not found
-        abort(404, description=f"Item with ID {item_id} not found.")
-    else:
-        return jsonify({'message': f'Item with ID {item_id} deleted successfully'}), 200 # OK status
+# The handlers below only see errors raised outside the route functions, such as
+# Werkzeug's routing 404/405; the routes return _error_response() directly.
 
 # Global error handler for 400 Bad Request
 @app.errorhandler(400)
 def bad_request(_error): # Renamed 'error' to '_error' to mark as intentionally unused
     """Handles 400 Bad Request errors."""
-    return jsonify({'error': 'Bad Request', 'message': _error.description}), 400
+    return _error_response(400, _error.description)
 
 # Global error handler for 404 Not Found
 @app.errorhandler(404)
 def not_found(_error): # Renamed 'error' to '_error'
     """Handles 404 Not Found errors."""
-    return jsonify({'error': 'Not Found', 'message': _error.description}), 404
+    return _error_response(404, _error.description)
 
 # Global error handler for 405 Method Not Allowed
 @app.errorhandler(405)
 def method_not_allowed(_error): # Renamed 'error' to '_error'
     """Handles 405 Method Not Allowed errors."""
-    return jsonify({'error': 'Method Not Allowed', 'message': _error.description}), 405
+    return _error_response(405, _error.description)
 
 # Global error handler for 500 Internal Server Error (for unexpected errors)
 @app.errorhandler(500)
@@ -155,9 +333,7 @@ def internal_server_error(_error): # Renamed 'error' to '_error'
     Handles 500 Internal Server Errors.
     In a production environment, you might log the actual error here.
     """
-    # Shortened message to fit line length.
-    return jsonify({'error': 'Internal Server Error',
-                    'message': 'An unexpected error occurred.'}), 500
+    return _error_response(500, 'An unexpected error occurred.')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,29 @@
+"""
+Gunicorn configuration for serving the Flask API outside the development server.
+Run it with: gunicorn -c gunicorn_conf.py app.main:app
+Do not use app.run(debug=True) in production; the debugger allows arbitrary code execution.
+"""
+import os
+
+from gevent import monkey
+
+# preload_app imports app.main in the master before gunicorn's gevent worker patches
+# anything, so patch here to make the module-level threading.Lock a gevent lock.
+monkey.patch_all()
+
+# Same address the Flask dev server and locustfile.py use.
+bind = os.environ.get('BIND', '127.0.0.1:5000')
+
+# gevent workers monkey-patch blocking I/O so each worker can hold many
+# concurrent connections instead of serving one request at a time.
+worker_class = 'gevent'
+worker_connections = 1000
+
+# The item store lives in process memory, so every worker would see its own copy
+# and a POST handled by one worker would be invisible to the others. Keep a single
+# worker by default; raise WEB_CONCURRENCY (e.g. os.cpu_count() * 2 + 1) only once
+# the store is moved out of process or the load is read-only.
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+
+# Import the app once in the master and fork workers from it.
+preload_app = True
@@ -4,8 +4,14 @@ It simulates various interactions like fetching, adding, and updating items.
 """
 import random  # Standard library imports first
 import json    # For JSONDecodeError
+from itertools import count
 from locust import HttpUser, task, between # Third-party imports after standard ones
 
+# Pre-encoded JSON bodies; formatting bytes skips building a dict and running json.dumps per request
+_POST_TMPL = b'{"name":"TestItem_%d","price":%.2f}'
+_PUT_TMPL = b'{"price":%.2f}'
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
 class WebsiteUser(HttpUser):
     """
     Simulates a user interacting with the Flask API.
@@ -24,11 +30,20 @@ class WebsiteUser(HttpUser):
         {'id': 2, 'name': 'Mouse', 'price': 25},
         {'id': 3, 'name': 'Keyboard', 'price': 75}
     ]
-    # We'll keep track of IDs to try and GET or PUT/DELETE for
-    known_item_ids = [item['id'] for item in initial_items]
-    # Using a leading underscore for this internal, mutable class-level variable
-    _next_simulated_id = max(known_item_ids) + 1 if known_item_ids else 1
+    # Upper bound on known_item_ids; the oldest IDs are dropped once it is exceeded
+    max_known_item_ids = 10_000
+
 
+    def __init__(self, *args, **kwargs):
+        """
+        Gives each simulated user its own ID bookkeeping.
+        Class-level lists would be shared and grown by every user at once.
+        """
+        super().__init__(*args, **kwargs)
+        # We'll keep track of IDs to try and GET or PUT/DELETE for
+        self.known_item_ids = [item['id'] for item in self.initial_items]
+        # Using a leading underscore for this internal counter of simulated item names
+        self._simulated_ids = count(max(self.known_item_ids) + 1)
 
     def on_start(self):
         """
@@ -42,6 +57,14 @@ class WebsiteUser(HttpUser):
         else:
             print("Starting new user (runner not available yet).")
 
+    def _random_known_item_id(self):
+        """
+        Returns a randomly chosen known item ID.
+        Indexes with randrange directly instead of going through random.choice.
+        """
+        ids = self.known_item_ids
+        return ids[random.randrange(len(ids))]
+
     @task(3) # This task has a weight of 3, meaning it's 3 times more likely to run
     def get_all_items(self):
         """
@@ -56,7 +79,7 @@ class WebsiteUser(HttpUser):
         Attempts to get a randomly chosen existing item ID.
         """
         if self.known_item_ids:
-            item_id = random.choice(self.known_item_ids)
+            item_id = self._random_known_item_id()
             self.client.get(f"/api/items/{item_id}", name="/api/items/{id} [GET One]")
         else:
             # If no items are known (e.g., after deletions), try a default or skip
@@ -68,19 +91,19 @@ class WebsiteUser(HttpUser):
         Simulates adding a new item to the API.
         Generates a unique item name and a random price.
         """
-        item_name = f"TestItem_{self._next_simulated_id}"
-        item_price = round(random.uniform(50, 500), 2)
-        payload = {
-            "name": item_name,
-            "price": item_price
-        }
-        with self.client.post("/api/items", json=payload, name="/api/items [POST]") as response:
+        item_price = random.uniform(50, 500)
+        body = _POST_TMPL % (next(self._simulated_ids), item_price)
+        with self.client.post("/api/items", data=body, headers=_JSON_HEADERS,
+                              name="/api/items [POST]") as response:
             if response.status_code == 201: # Check for successful creation
                 try:
                     new_item = response.json().get('item')
                     if new_item and 'id' in new_item:
-                        self.known_item_ids.append(new_item['id'])
-                        self._next_simulated_id += 1 # Update _next_simulated_id
+                        ids = self.known_item_ids
+                        ids.append(new_item['id'])
+                        # Keep long runs from growing the list without bound
+                        if len(ids) > self.max_known_item_ids:
+                            del ids[:len(ids) - self.max_known_item_ids]
                 # Catching specific JSON decoding errors
                 except json.JSONDecodeError as e: # W0718: Catching specific exception
                     print(f"Error parsing response for add_new_item: {e}")
@@ -100,10 +123,10 @@ class WebsiteUser(HttpUser):
         Chooses a random known item ID to update.
         """
         if self.known_item_ids:
-            item_id = random.choice(self.known_item_ids)
-            updated_price = round(random.uniform(100, 1000), 2)
-            payload = {"price": updated_price}
-            self.client.put(f"/api/items/{item_id}", json=payload, name="/api/items/{id} [PUT]")
+            item_id = self._random_known_item_id()
+            body = _PUT_TMPL % random.uniform(100, 1000)
+            self.client.put(f"/api/items/{item_id}", data=body, headers=_JSON_HEADERS,
+                            name="/api/items/{id} [PUT]")
         else:
             print("No items to update, skipping update task.")
 
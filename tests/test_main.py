@@ -1,214 +1,442 @@
-import unittest
+"""
+Test suite for the Flask API endpoints.
+"""
 import json
+import sys
+import threading
+from itertools import count
+
+import pytest
+
 # Import the app.main module itself so we can access its global variables directly
 import app.main
 
-class FlaskApiTestCase(unittest.TestCase):
-    """
-    Test suite for the Flask API endpoints.
-    """
-
-    def setUp(self):
-        """
-        Set up the test client and initialize the in-memory data before each test.
-        This ensures tests are isolated and start with a clean state.
-        """
-        # Access the Flask app instance directly from the imported module
-        self.client = app.main.app.test_client()
-        app.main.app.testing = True # Enable testing mode for Flask app
-
-        # Reset the in-memory data directly by modifying the global variables
-        # within the app.main module. This is crucial for test isolation.
-        app.main.items.clear() # Clear the existing list in app.main
-        app.main.items.extend([ # Populate it with the initial test data
-            {'id': 1, 'name': 'Laptop', 'price': 1200},
-            {'id': 2, 'name': 'Mouse', 'price': 25},
-            {'id': 3, 'name': 'Keyboard', 'price': 75}
-        ])
-        app.main._next_id = 4 # Reset the next_id in app.main
-
-    def test_get_all_items(self):
-        """
-        Test the GET /api/items endpoint to retrieve all items.
-        """
-        response = self.client.get('/api/items')
-        self.assertEqual(response.status_code, 200)
-        # Assert against the known initial state, which setUp ensures is consistent
-        self.assertEqual(json.loads(response.data), [
-            {'id': 1, 'name': 'Laptop', 'price': 1200},
-            {'id': 2, 'name': 'Mouse', 'price': 25},
-            {'id': 3, 'name': 'Keyboard', 'price': 75}
-        ])
-
-    def test_get_item_by_id_success(self):
-        """
-        Test the GET /api/items/<id> endpoint for a successful retrieval.
-        """
-        response = self.client.get('/api/items/1')
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(json.loads(response.data), {'id': 1, 'name': 'Laptop', 'price': 1200})
-
-    def test_get_item_by_id_not_found(self):
-        """
-        Test the GET /api/items/<id> endpoint for a non-existent item.
-        Expects a 404 Not Found error.
-        """
-        response = self.client.get('/api/items/999')
-        self.assertEqual(response.status_code, 404)
-        self.assertIn(b"Item with ID 999 not found.", response.data)
-
-    def test_add_item_success(self):
-        """
-        Test the POST /api/items endpoint for successful item creation.
-        """
-        new_item_data = {'name': 'Monitor', 'price': 300}
-        response = self.client.post(
-            '/api/items',
-            data=json.dumps(new_item_data),
-            content_type='application/json'
-        )
-        self.assertEqual(response.status_code, 201) # 201 Created
-        response_data = json.loads(response.data)
-        self.assertIn('message', response_data)
-        self.assertIn('item', response_data)
-        self.assertEqual(response_data['item']['name'], 'Monitor')
-        self.assertEqual(response_data['item']['price'], 300)
-        self.assertEqual(response_data['item']['id'], 4) # Expecting the next_id
-
-        # Verify the item was actually added by fetching all items from the API
-        get_response = self.client.get('/api/items')
-        current_items = json.loads(get_response.data)
-        self.assertEqual(len(current_items), 4) # This assertion should now pass
-        self.assertEqual(current_items[3]['name'], 'Monitor')
-        self.assertEqual(current_items[3]['id'], 4)
-
-    def test_add_item_missing_name(self):
-        """
-        Test POST /api/items with missing 'name' field.
-        Expects a 400 Bad Request error.
-        """
-        invalid_data = {'price': 50}
-        response = self.client.post(
-            '/api/items',
-            data=json.dumps(invalid_data),
-            content_type='application/json'
-        )
-        self.assertEqual(response.status_code, 400)
-        self.assertIn(b"Missing 'name' or 'price' in request body.", response.data)
-
-    def test_add_item_invalid_price_type(self):
-        """
-        Test POST /api/items with invalid 'price' type.
-        Expects a 400 Bad Request error.
-        """
-        invalid_data = {'name': 'Charger', 'price': 'fifty'}
-        response = self.client.post(
-            '/api/items',
-            data=json.dumps(invalid_data),
-            content_type='application/json'
-        )
-        self.assertEqual(response.status_code, 400)
-        self.assertIn(b"'name' must be a string and 'price' must be a number.", response.data)
-
-    def test_add_item_non_json_request(self):
-        """
-        Test POST /api/items with a non-JSON request body.
-        Expects a 400 Bad Request error.
-        """
-        response = self.client.post(
-            '/api/items',
-            data="This is not JSON",
-            content_type='text/plain' # Incorrect content type
-        )
-        self.assertEqual(response.status_code, 400)
-        self.assertIn(b"Request must be JSON.", response.data)
-
-    def test_update_item_success(self):
-        """
-        Test the PUT /api/items/<id> endpoint for successful item update.
-        """
-        update_data = {'price': 1300}
-        response = self.client.put(
-            '/api/items/1',
-            data=json.dumps(update_data),
-            content_type='application/json'
-        )
-        self.assertEqual(response.status_code, 200)
-        response_data = json.loads(response.data)
-        self.assertIn('message', response_data)
-        self.assertIn('item', response_data)
-        self.assertEqual(response_data['item']['id'], 1)
-        self.assertEqual(response_data['item']['price'], 1300)
-
-        # Verify the item was actually updated by fetching it again from the API
-        get_response = self.client.get('/api/items/1')
-        updated_item = json.loads(get_response.data)
-        self.assertEqual(updated_item['price'], 1300) # This assertion should now pass
-
-    def test_update_item_not_found(self):
-        """
-        Test PUT /api/items/<id> for a non-existent item.
-        Expects a 404 Not Found error.
-        """
-        update_data = {'price': 500}
-        response = self.client.put(
-            '/api/items/999',
-            data=json.dumps(update_data),
-            content_type='application/json'
-        )
-        self.assertEqual(response.status_code, 404)
-        self.assertIn(b"Item with ID 999 not found.", response.data)
-
-    def test_update_item_no_data(self):
-        """
-        Test PUT /api/items/<id> with an empty JSON body.
-        Expects a 400 Bad Request error.
-        """
-        response = self.client.put(
-            '/api/items/1',
-            data=json.dumps({}),
-            content_type='application/json'
-        )
-        self.assertEqual(response.status_code, 400)
-        self.assertIn(b"No update data provided.", response.data)
-
-    def test_delete_item_success(self):
-        """
-        Test the DELETE /api/items/<id> endpoint for successful item deletion.
-        """
-        response = self.client.delete('/api/items/2')
-        self.assertEqual(response.status_code, 200)
-        self.assertIn(b"Item with ID 2 deleted successfully", response.data)
-
-        # Verify the item was actually removed by fetching all items from the API
-        get_response = self.client.get('/api/items')
-        current_items = json.loads(get_response.data)
-        self.assertEqual(len(current_items), 2) # This assertion should now pass
-        self.assertNotIn({'id': 2, 'name': 'Mouse', 'price': 25}, current_items)
-        self.assertEqual(current_items, [
-            {'id': 1, 'name': 'Laptop', 'price': 1200},
-            {'id': 3, 'name': 'Keyboard', 'price': 75}
-        ])
-
-    def test_delete_item_not_found(self):
-        """
-        Test DELETE /api/items/<id> for a non-existent item.
-        Expects a 404 Not Found error.
-        """
-        response = self.client.delete('/api/items/999')
-        self.assertEqual(response.status_code, 404)
-        self.assertIn(b"Item with ID 999 not found.", response.data)
-
-    def test_method_not_allowed(self):
-        """
-        Test an invalid HTTP method for an endpoint.
-        Expects a 405 Method Not Allowed error.
-        """
-        response = self.client.post('/api/items/1') # POST not allowed on /api/items/<id>
-        self.assertEqual(response.status_code, 405)
-        self.assertIn(b"Method Not Allowed", response.data)
-
-
-if __name__ == '__main__':
-    unittest.main()
 
+@pytest.fixture(scope='module')
+def client():
+    """
+    Provides one in-process test client shared by every test in this module.
+    """
+    app.main.app.testing = True # Enable testing mode for Flask app
+    return app.main.app.test_client()
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    """
+    Initialize the in-memory data before each test.
+    This ensures tests are isolated and start with a clean state.
+    """
+    # Reset the in-memory data directly by modifying the global variables
+    # within the app.main module. This is crucial for test isolation.
+    app.main.items_by_id.clear() # Clear the existing dict in app.main
+    app.main.items_by_id.update({ # Populate it with the initial test data
+        1: app.main.Item(1, 'Laptop', 1200),
+        2: app.main.Item(2, 'Mouse', 25),
+        3: app.main.Item(3, 'Keyboard', 75)
+    })
+    app.main._id_seq = count(4) # Restart the ID sequence in app.main
+    app.main._items_listing = None # Drop the GET /api/items body cached by earlier tests
+    app.main._item_json = {} # Drop any GET /api/items/<id> bodies cached by earlier tests
+
+
+def test_get_all_items(client):
+    """
+    Test the GET /api/items endpoint to retrieve all items.
+    """
+    response = client.get('/api/items')
+    assert response.status_code == 200
+    # Assert against the known initial state, which reset_state ensures is consistent
+    assert json.loads(response.data) == [
+        {'id': 1, 'name': 'Laptop', 'price': 1200},
+        {'id': 2, 'name': 'Mouse', 'price': 25},
+        {'id': 3, 'name': 'Keyboard', 'price': 75}
+    ]
+
+
+def test_get_all_items_etag_not_modified(client):
+    """
+    Test GET /api/items returns an ETag and answers 304 Not Modified
+    when the client already holds the current representation.
+    """
+    response = client.get('/api/items')
+    etag = response.headers['ETag']
+    cached = client.get('/api/items', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+
+
+def test_get_all_items_weak_etag_not_modified(client):
+    """
+    Test GET /api/items answers 304 Not Modified when the client sends the
+    current ETag back as a weak validator.
+    """
+    etag = client.get('/api/items').headers['ETag']
+    cached = client.get('/api/items', headers={'If-None-Match': f'W/{etag}'})
+    assert cached.status_code == 304
+
+
+def test_get_all_items_etag_changes_after_update(client):
+    """
+    Test the GET /api/items cache is invalidated when an item changes.
+    """
+    etag = client.get('/api/items').headers['ETag']
+    client.put(
+        '/api/items/2',
+        data=json.dumps({'price': 30}),
+        content_type='application/json'
+    )
+    response = client.get('/api/items', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert json.loads(response.data)[1]['price'] == 30
+
+
+def test_get_item_by_id_success(client):
+    """
+    Test the GET /api/items/<id> endpoint for a successful retrieval.
+    """
+    response = client.get('/api/items/1')
+    assert response.status_code == 200
+    assert json.loads(response.data) == {'id': 1, 'name': 'Laptop', 'price': 1200}
+
+
+def test_get_item_by_id_reflects_update(client):
+    """
+    Test the cached GET /api/items/<id> body is dropped when the item changes.
+    """
+    assert json.loads(client.get('/api/items/2').data)['price'] == 25
+    client.put(
+        '/api/items/2',
+        data=json.dumps({'price': 30}),
+        content_type='application/json'
+    )
+    assert json.loads(client.get('/api/items/2').data)['price'] == 30
+
+
+def test_get_item_by_id_not_found(client):
+    """
+    Test the GET /api/items/<id> endpoint for a non-existent item.
+    Expects a 404 Not Found error.
+    """
+    response = client.get('/api/items/999')
+    assert response.status_code == 404
+    assert b"Item with ID 999 not found." in response.data
+
+
+def test_add_item_success(client):
+    """
+    Test the POST /api/items endpoint for successful item creation.
+    """
+    new_item_data = {'name': 'Monitor', 'price': 300}
+    response = client.post(
+        '/api/items',
+        data=json.dumps(new_item_data),
+        content_type='application/json'
+    )
+    assert response.status_code == 201 # 201 Created
+    response_data = json.loads(response.data)
+    assert 'message' in response_data
+    assert 'item' in response_data
+    assert response_data['item']['name'] == 'Monitor'
+    assert response_data['item']['price'] == 300
+    assert response_data['item']['id'] == 4 # Expecting the next_id
+
+    # Verify the item was actually added by fetching all items from the API
+    get_response = client.get('/api/items')
+    current_items = json.loads(get_response.data)
+    assert len(current_items) == 4 # This assertion should now pass
+    assert current_items[3]['name'] == 'Monitor'
+    assert current_items[3]['id'] == 4
+
+
+def test_add_item_missing_name(client):
+    """
+    Test POST /api/items with missing 'name' field.
+    Expects a 400 Bad Request error.
+    """
+    invalid_data = {'price': 50}
+    response = client.post(
+        '/api/items',
+        data=json.dumps(invalid_data),
+        content_type='application/json'
+    )
+    assert response.status_code == 400
+    assert b"Missing 'name' or 'price' in request body." in response.data
+
+
+def test_add_item_invalid_price_type(client):
+    """
+    Test POST /api/items with invalid 'price' type.
+    Expects a 400 Bad Request error.
+    """
+    invalid_data = {'name': 'Charger', 'price': 'fifty'}
+    response = client.post(
+        '/api/items',
+        data=json.dumps(invalid_data),
+        content_type='application/json'
+    )
+    assert response.status_code == 400
+    assert b"'name' must be a string and 'price' must be a number." in response.data
+
+
+def test_add_item_boolean_price(client):
+    """
+    Test POST /api/items with a boolean 'price'.
+    Expects a 400 Bad Request error; booleans are not numbers.
+    """
+    response = client.post(
+        '/api/items',
+        data=json.dumps({'name': 'Charger', 'price': True}),
+        content_type='application/json'
+    )
+    assert response.status_code == 400
+    assert b"'name' must be a string and 'price' must be a number." in response.data
+
+
+def test_add_item_non_json_request(client):
+    """
+    Test POST /api/items with a non-JSON request body.
+    Expects a 400 Bad Request error.
+    """
+    response = client.post(
+        '/api/items',
+        data="This is not JSON",
+        content_type='text/plain' # Incorrect content type
+    )
+    assert response.status_code == 400
+    assert b"Request must be JSON." in response.data
+
+
+def test_add_item_malformed_json(client):
+    """
+    Test POST /api/items with a JSON content type but an unparseable body.
+    Expects a 400 Bad Request error.
+    """
+    response = client.post(
+        '/api/items',
+        data='{"name": "Charger",',
+        content_type='application/json'
+    )
+    assert response.status_code == 400
+    assert b"Request body is not valid JSON." in response.data
+
+
+def test_add_item_concurrent_ids_unique(client):
+    """
+    Test concurrent POST /api/items requests each get a distinct ID.
+    """
+    def post_items():
+        thread_client = app.main.app.test_client()
+        for _ in range(25):
+            thread_client.post(
+                '/api/items',
+                data=json.dumps({'name': 'Cable', 'price': 5}),
+                content_type='application/json'
+            )
+
+    threads = [threading.Thread(target=post_items) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    current_items = json.loads(client.get('/api/items').data)
+    ids = [item['id'] for item in current_items]
+    assert len(ids) == 103
+    assert len(set(ids)) == 103
+
+
+def test_update_item_deleted_after_lookup(client, monkeypatch):
+    """
+    Test PUT /api/items/<id> when a DELETE lands after the initial lookup.
+    Expects a 404 Not Found error rather than updating the detached item.
+    """
+    loads = app.main.orjson.loads
+
+    def loads_then_delete(raw):
+        # Simulate a concurrent DELETE finishing while the PUT body is decoded
+        client.delete('/api/items/2')
+        return loads(raw)
+
+    monkeypatch.setattr(app.main.orjson, 'loads', loads_then_delete)
+    response = client.put(
+        '/api/items/2',
+        data=json.dumps({'price': 30}),
+        content_type='application/json'
+    )
+    assert response.status_code == 404
+    assert b"Item with ID 2 not found." in response.data
+
+
+def test_get_all_items_concurrent_with_updates(client):
+    """
+    Test GET /api/items never returns an empty body while PUTs keep
+    invalidating the cached listing.
+    """
+    bodies = []
+
+    def read_items():
+        reader = app.main.app.test_client()
+        for _ in range(1500):
+            response = reader.get('/api/items')
+            bodies.append((response.status_code, response.data))
+
+    def update_items():
+        writer = app.main.app.test_client()
+        for price in range(1500):
+            writer.put(
+                '/api/items/2',
+                data=json.dumps({'price': price}),
+                content_type='application/json'
+            )
+
+    threads = [threading.Thread(target=read_items) for _ in range(4)]
+    threads += [threading.Thread(target=update_items) for _ in range(2)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6) # Switch threads as often as possible to widen any race window
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert len(bodies) == 6000
+    for status_code, data in bodies:
+        assert status_code == 200
+        assert len(json.loads(data)) == 3
+
+
+def test_update_item_success(client):
+    """
+    Test the PUT /api/items/<id> endpoint for successful item update.
+    """
+    update_data = {'price': 1300}
+    response = client.put(
+        '/api/items/1',
+        data=json.dumps(update_data),
+        content_type='application/json'
+    )
+    assert response.status_code == 200
+    response_data = json.loads(response.data)
+    assert 'message' in response_data
+    assert 'item' in response_data
+    assert response_data['item']['id'] == 1
+    assert response_data['item']['price'] == 1300
+
+    # Verify the item was actually updated by fetching it again from the API
+    get_response = client.get('/api/items/1')
+    updated_item = json.loads(get_response.data)
+    assert updated_item['price'] == 1300 # This assertion should now pass
+
+
+def test_update_item_not_found(client):
+    """
+    Test PUT /api/items/<id> for a non-existent item.
+    Expects a 404 Not Found error.
+    """
+    update_data = {'price': 500}
+    response = client.put(
+        '/api/items/999',
+        data=json.dumps(update_data),
+        content_type='application/json'
+    )
+    assert response.status_code == 404
+    assert b"Item with ID 999 not found." in response.data
+
+
+def test_update_item_invalid_field_leaves_item_unchanged(client):
+    """
+    Test PUT /api/items/<id> with one valid and one invalid field.
+    Expects a 400 Bad Request error and no partial update.
+    """
+    response = client.put(
+        '/api/items/1',
+        data=json.dumps({'name': 'Notebook', 'price': 'cheap'}),
+        content_type='application/json'
+    )
+    assert response.status_code == 400
+    assert b"'price' must be a number." in response.data
+    item = json.loads(client.get('/api/items/1').data)
+    assert item == {'id': 1, 'name': 'Laptop', 'price': 1200}
+
+
+def test_update_item_boolean_price(client):
+    """
+    Test PUT /api/items/<id> with a boolean 'price'.
+    Expects a 400 Bad Request error; booleans are not numbers.
+    """
+    response = client.put(
+        '/api/items/1',
+        data=json.dumps({'price': True}),
+        content_type='application/json'
+    )
+    assert response.status_code == 400
+    assert b"'price' must be a number." in response.data
+
+
+def test_update_item_no_data(client):
+    """
+    Test PUT /api/items/<id> with an empty JSON body.
+    Expects a 400 Bad Request error.
+    """
+    response = client.put(
+        '/api/items/1',
+        data=json.dumps({}),
+        content_type='application/json'
+    )
+    assert response.status_code == 400
+    assert b"No update data provided." in response.data
+
+
+def test_delete_item_success(client):
+    """
+    Test the DELETE /api/items/<id> endpoint for successful item deletion.
+    """
+    response = client.delete('/api/items/2')
+    assert response.status_code == 200
+    assert b"Item with ID 2 deleted successfully" in response.data
+
+    # Verify the item was actually removed by fetching all items from the API
+    get_response = client.get('/api/items')
+    current_items = json.loads(get_response.data)
+    assert len(current_items) == 2 # This assertion should now pass
+    assert {'id': 2, 'name': 'Mouse', 'price': 25} not in current_items
+    assert current_items == [
+        {'id': 1, 'name': 'Laptop', 'price': 1200},
+        {'id': 3, 'name': 'Keyboard', 'price': 75}
+    ]
+
+
+def test_delete_item_mutates_store_in_place(client):
+    """
+    Test DELETE /api/items/<id> removes the item from the existing store
+    instead of rebinding app.main.items_by_id to a new object.
+    """
+    store = app.main.items_by_id
+    response = client.delete('/api/items/1')
+    assert response.status_code == 200
+    assert app.main.items_by_id is store
+    assert 1 not in store
+
+
+def test_delete_item_not_found(client):
+    """
+    Test DELETE /api/items/<id> for a non-existent item.
+    Expects a 404 Not Found error.
+    """
+    response = client.delete('/api/items/999')
+    assert response.status_code == 404
+    assert b"Item with ID 999 not found." in response.data
+
+
+def test_method_not_allowed(client):
+    """
+    Test an invalid HTTP method for an endpoint.
+    Expects a 405 Method Not Allowed error.
+    """
+    response = client.post('/api/items/1') # POST not allowed on /api/items/<id>
+    assert response.status_code == 405
+    assert b"Method Not Allowed" in response.data